@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # API Keys
@@ -19,14 +19,25 @@ class Settings(BaseSettings):
     
     # Vector Store Configuration
     QDRANT_COLLECTION: str = "rag_documents"
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_GRPC_PORT: int = 6334
     EMBEDDING_DIM: int = 384
     
+    # Embedding Configuration
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"  # 'torch' or 'onnx'
+    EMBEDDING_ONNX_FILE: str = "onnx/model_qint8_avx512_vnni.onnx"
+    EMBEDDING_MAX_SEQ_LENGTH: int = 128
+    EMBED_QUEUE_BATCH_SIZE: int = 32
+    EMBED_QUEUE_WINDOW_MS: int = 5
+    
     # LLM Configuration
     MODEL_NAME: str = "llama-3.1-8b-instant"
     
     # Chunking Configuration
     CHUNK_SIZE: int = 400
     CHUNK_OVERLAP: int = 50
+    INGEST_BATCH_SIZE: int = 64
     
     # File Upload Configuration
     UPLOAD_DIR: str = "uploads"
@@ -38,8 +49,27 @@ class Settings(BaseSettings):
     MONGO_DOCS_COLLECTION: str = "documents"
     MONGO_BOOKINGS_COLLECTION: str = "bookings"
     
+    # Startup Configuration
+    RAG_EAGER_INIT: bool = False
+    WARMUP: bool = False
+    
+    # CORS Configuration
+    CORS_ORIGINS: List[str] = ["*"]
+    CORS_ORIGIN_REGEX: Optional[str] = None
+    CORS_MAX_AGE: int = 86400
+    
+    # Health Check Configuration
+    HEALTH_CACHE_TTL: int = 10
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
+        frozen = True
+
+settings = Settings()
 
-settings = Settings()
\ No newline at end of file
+# Hot-path constants, bound once to skip attribute lookups on settings
+CHUNK_SIZE = settings.CHUNK_SIZE
+CHUNK_OVERLAP = settings.CHUNK_OVERLAP
+EMBEDDING_DIM = settings.EMBEDDING_DIM
+REDIS_TTL = settings.REDIS_TTL
\ No newline at end of file
@@ -1,54 +1,94 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+from typing import Awaitable, Callable, Dict, Tuple
+import logging
 import os
+import time
 
 from app.config import settings
 from app.routes import ingest, chat
+from app.utils.pdf_to_text import shutdown_pdf_pool
+from app.services.registry import (
+    get_vector_store,
+    get_redis_memory,
+    get_embedding_service,
+    get_rag_service,
+    get_booking_engine,
+)
+
+# Configure only this app's logger; root stays untouched so libraries
+# like httpx don't start logging every request at INFO
+logger = logging.getLogger("rag")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    logger.addHandler(_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
 
 # Create uploads directory
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
+# Getters for every lazily initialized service
+_SERVICE_GETTERS = (
+    get_vector_store,
+    get_redis_memory,
+    get_embedding_service,
+    get_rag_service,
+    get_booking_engine,
+)
+
+async def _warmup():
+    """Initialize all services in worker threads after startup."""
+    try:
+        await asyncio.gather(*(asyncio.to_thread(getter) for getter in _SERVICE_GETTERS))
+        logger.info("Service warmup complete")
+    except Exception as e:
+        logger.error(f"Service warmup failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
-    print("=" * 60)
-    print("RAG Backend Starting...")
-    print("=" * 60)
-    print(f"Upload Directory: {settings.UPLOAD_DIR}")
-    print(f"Qdrant URL: {settings.QDRANT_URL}")
-    print(f"MongoDB URI: {'Connected' if settings.MONGODB_URI else 'Not configured'}")
-    print(f"Redis: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
-    print(f"Model: {settings.MODEL_NAME}")
-    print(f"Embedding Dimension: {settings.EMBEDDING_DIM}")
-    print(f"Chunk Size: {settings.CHUNK_SIZE}")
-    print("=" * 60)
+    logger.info("\n".join([
+        "=" * 60,
+        "RAG Backend Starting...",
+        "=" * 60,
+        f"Upload Directory: {settings.UPLOAD_DIR}",
+        f"Qdrant URL: {settings.QDRANT_URL}",
+        f"MongoDB URI: {'Connected' if settings.MONGODB_URI else 'Not configured'}",
+        f"Redis: {settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        f"Model: {settings.MODEL_NAME}",
+        f"Embedding Dimension: {settings.EMBEDDING_DIM}",
+        f"Chunk Size: {settings.CHUNK_SIZE}",
+        "=" * 60
+    ]))
     
-    # Initialize services (this ensures connections are established)
-    try:
-        from app.services.vector_store import vector_store_service
-        from app.services.redis_memory import redis_memory_service
-        from app.services.embeddings import embedding_service
-        from app.services.rag import rag_service
-        from app.services.booking_engine import booking_engine
-        
-        print("✓ Vector Store Service initialized")
-        print("✓ Redis Memory Service initialized")
-        print("✓ Embedding Service initialized")
-        print("✓ RAG Service initialized")
-        print("✓ Booking Engine initialized")
-        print("=" * 60)
-        print("Server ready to accept requests!")
-        print("=" * 60)
-    except Exception as e:
-        print(f"✗ Failed to initialize services: {e}")
-        print("=" * 60)
+    # Services are initialized lazily on first use; opt in to eager
+    # initialization (e.g. for CI smoke tests) with RAG_EAGER_INIT=1
+    if settings.RAG_EAGER_INIT:
+        try:
+            for getter in _SERVICE_GETTERS:
+                getter()
+            logger.info("All services initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize services: {e}")
+    
+    # Optionally warm services up in the background so the server reports
+    # ready immediately and the first request avoids the cold-init cost
+    if settings.WARMUP:
+        app.state.warmup_task = asyncio.create_task(_warmup())
+    
+    logger.info("Server ready to accept requests!")
     
     yield
     
     # Shutdown
-    print("\nShutting down RAG Backend...")
+    logger.info("Shutting down RAG Backend...")
+    shutdown_pdf_pool()
 
 # Create FastAPI app
 app = FastAPI(
@@ -58,16 +98,20 @@ app = FastAPI(
         "conversational AI, and interview booking capabilities."
     ),
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this for production
+    allow_origins=settings.CORS_ORIGINS,  # Set CORS_ORIGINS for production
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["X-Booking-Flow", "X-Booking-Complete"],  # Read by /chat/stream clients
+    max_age=settings.CORS_MAX_AGE,
 )
 
 # Include routers
@@ -90,65 +134,85 @@ async def root():
         }
     }
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    health_status = {
-        "status": "healthy",
-        "services": {}
-    }
+# Cached health check results: service name -> (checked_at, result)
+_health_cache: Dict[str, Tuple[float, Dict]] = {}
+
+async def _cached_check(name: str, check: Callable[[], Awaitable[Dict]]) -> Dict:
+    """
+    Run a service health check, reusing its result for a short period.
     
-    # Check Qdrant
-    try:
-        from app.services.vector_store import vector_store_service
-        collection_info = vector_store_service.get_collection_info()
-        health_status["services"]["qdrant"] = {
-            "status": "connected",
-            "collection": collection_info
-        }
-    except Exception as e:
-        health_status["services"]["qdrant"] = {
-            "status": "error",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    Args:
+        name: Service name used as the cache key
+        check: Coroutine function returning the service status
+        
+    Returns:
+        Service status, with errors reported as {"status": "error", ...}
+    """
+    now = time.monotonic()
+    cached = _health_cache.get(name)
+    if cached and now - cached[0] < settings.HEALTH_CACHE_TTL:
+        return cached[1]
     
-    # Check Redis
     try:
-        from app.services.redis_memory import redis_memory_service
-        redis_memory_service.client.ping()
-        health_status["services"]["redis"] = {"status": "connected"}
+        result = await check()
     except Exception as e:
-        health_status["services"]["redis"] = {
-            "status": "error",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+        result = {"status": "error", "error": str(e)}
     
-    # Check MongoDB
-    try:
-        from app.services.rag import rag_service
-        rag_service.mongo_client.admin.command('ping')
-        health_status["services"]["mongodb"] = {"status": "connected"}
-    except Exception as e:
-        health_status["services"]["mongodb"] = {
-            "status": "error",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    _health_cache[name] = (now, result)
+    return result
+
+async def _check_qdrant() -> Dict:
+    """Check Qdrant connectivity."""
+    collection_info = await asyncio.to_thread(
+        lambda: get_vector_store().get_collection_info()
+    )
+    return {"status": "connected", "collection": collection_info}
+
+async def _check_redis() -> Dict:
+    """Check Redis connectivity."""
+    await get_redis_memory().client.ping()
+    return {"status": "connected"}
+
+async def _check_mongodb() -> Dict:
+    """Check MongoDB connectivity."""
+    await asyncio.to_thread(
+        lambda: get_rag_service().mongo_client.admin.command('ping')
+    )
+    return {"status": "connected"}
+
+async def _check_groq() -> Dict:
+    """Check Groq client configuration."""
+    if get_booking_engine().groq_client:
+        return {"status": "configured"}
+    return {"status": "not_configured"}
+
+@app.get("/health")
+async def health_check():
+    """
+    Health check endpoint.
     
-    # Check Groq
-    try:
-        from app.services.booking_engine import booking_engine
-        if booking_engine.groq_client:
-            health_status["services"]["groq"] = {"status": "configured"}
-        else:
-            health_status["services"]["groq"] = {"status": "not_configured"}
-    except Exception as e:
-        health_status["services"]["groq"] = {
-            "status": "error",
-            "error": str(e)
-        }
+    Service checks run concurrently and are cached for HEALTH_CACHE_TTL
+    seconds so frequent probes do not hit every backend on each request.
+    """
+    checks = {
+        "qdrant": _check_qdrant,
+        "redis": _check_redis,
+        "mongodb": _check_mongodb,
+        "groq": _check_groq
+    }
+    results = await asyncio.gather(
+        *(_cached_check(name, check) for name, check in checks.items())
+    )
+    
+    health_status = {
+        "status": "healthy",
+        "services": dict(zip(checks, results))
+    }
+    
+    # Groq is optional for health; the data stores are not
+    for name in ("qdrant", "redis", "mongodb"):
+        if health_status["services"][name]["status"] == "error":
+            health_status["status"] = "degraded"
     
     if health_status["status"] == "degraded":
         raise HTTPException(status_code=503, detail=health_status)
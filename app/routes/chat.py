@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
-from app.services.redis_memory import redis_memory_service
-from app.services.rag import rag_service
-from app.services.booking_engine import booking_engine
+from app.services.redis_memory import SessionKeys
+from app.services.registry import get_redis_memory, get_rag_service, get_booking_engine
 
 router = APIRouter()
 
@@ -23,8 +25,180 @@ class ChatResponse(BaseModel):
     booking_complete: bool
     booking_data: Optional[Dict[str, Any]] = None
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def _build_response(
+    session_id: str,
+    user_message: str,
+    assistant_message: str,
+    *,
+    is_booking_flow: bool = False,
+    booking_complete: bool = False,
+    booking_data: Optional[Dict[str, Any]] = None
+) -> ChatResponse:
+    """
+    Build a chat response without re-running field validation.
+    
+    All inputs are produced by this module and the services it calls,
+    so they always match the ChatResponse schema.
+    """
+    return ChatResponse.model_construct(
+        session_id=session_id,
+        user_message=user_message,
+        assistant_message=assistant_message,
+        is_booking_flow=is_booking_flow,
+        booking_complete=booking_complete,
+        booking_data=booking_data
+    )
+
+async def _handle_booking(
+    session_id: str,
+    keys: SessionKeys,
+    user_message: str,
+    redis_memory_service,
+    booking_engine
+) -> Optional[ChatResponse]:
+    """
+    Run the booking flow for a message, if it applies.
+    
+    Continues an in-progress booking, or starts one when booking intent
+    is detected. The assistant reply is recorded in Redis.
+    
+    Args:
+        session_id: Session identifier
+        keys: Session keys
+        user_message: User's message
+        redis_memory_service: Redis memory service
+        booking_engine: Booking engine
+        
+    Returns:
+        Chat response for booking turns, or None if the message should go to RAG
+    """
+    # Check if currently in booking flow
+    booking_state = await redis_memory_service.get_booking_state(keys)
+    in_booking_flow = bool(booking_state)
+    
+    # Handle booking flow
+    if in_booking_flow:
+        try:
+            # Process booking input
+            response_message, booking_data, is_complete = await booking_engine.process_booking_input(
+                session_id=session_id,
+                user_input=user_message,
+                current_state=booking_state
+            )
+            
+            if is_complete:
+                # Booking completed
+                await redis_memory_service.record_response(
+                    keys, response_message, clear_booking=True
+                )
+                
+                return _build_response(
+                    session_id,
+                    user_message,
+                    response_message,
+                    is_booking_flow=True,
+                    booking_complete=True,
+                    booking_data=booking_data
+                )
+            else:
+                # Continue booking flow
+                await redis_memory_service.record_response(
+                    keys, response_message, booking_state=booking_state
+                )
+                
+                return _build_response(
+                    session_id, user_message, response_message, is_booking_flow=True
+                )
+        except Exception as e:
+            # If booking fails, clear state and return error
+            error_msg = f"Booking process error: {str(e)}. Please start over."
+            await redis_memory_service.record_response(
+                keys, error_msg, clear_booking=True
+            )
+            return _build_response(session_id, user_message, error_msg)
+    
+    # Check for booking intent
+    try:
+        # Intent detection may call the LLM, so keep it off the event loop
+        if await asyncio.to_thread(booking_engine.detect_booking_intent, user_message):
+            # Start booking flow
+            response_message = booking_engine.start_booking()
+            
+            # Initialize booking state
+            initial_state = {"step": "name"}
+            await redis_memory_service.record_response(
+                keys, response_message, booking_state=initial_state
+            )
+            
+            return _build_response(
+                session_id, user_message, response_message, is_booking_flow=True
+            )
+    except Exception as e:
+        print(f"Booking intent detection error: {e}")
+        # Continue to regular RAG if intent detection fails
+    
+    return None
+
+@asynccontextmanager
+async def _chat_errors():
+    """Pass HTTP errors through and report anything else as a logged 500."""
+    try:
+        yield
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Log the full error for debugging
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Chat processing failed: {str(e)}"
+        )
+
+async def _start_turn(
+    request: ChatRequest,
+    redis_memory_service,
+    booking_engine
+) -> Tuple[SessionKeys, str, Optional[ChatResponse]]:
+    """
+    Validate a chat message, record it and run the booking flow.
+    
+    Args:
+        request: Chat request with session_id and message
+        redis_memory_service: Redis memory service
+        booking_engine: Booking engine
+        
+    Returns:
+        Tuple of (keys, user_message, booking_response); booking_response
+        is None when the message should go to RAG
+        
+    Raises:
+        HTTPException: If the message is empty
+    """
+    keys = SessionKeys.for_session(request.session_id)
+    user_message = request.message.strip()
+    
+    if not user_message:
+        raise HTTPException(
+            status_code=400,
+            detail="Message cannot be empty"
+        )
+    
+    # Add user message to history
+    await redis_memory_service.add_message(keys, "user", user_message)
+    
+    booking_response = await _handle_booking(
+        request.session_id, keys, user_message, redis_memory_service, booking_engine
+    )
+    return keys, user_message, booking_response
+
+@router.post("/chat", response_model=ChatResponse, response_model_exclude_none=True)
+async def chat(
+    request: ChatRequest,
+    redis_memory_service=Depends(get_redis_memory),
+    rag_service=Depends(get_rag_service),
+    booking_engine=Depends(get_booking_engine)
+):
     """
     Conversational RAG endpoint with integrated booking flow.
     
@@ -43,100 +217,17 @@ async def chat(request: ChatRequest):
     Returns:
         Chat response with assistant's message and booking status
     """
-    try:
-        session_id = request.session_id
-        user_message = request.message.strip()
-        
-        if not user_message:
-            raise HTTPException(
-                status_code=400,
-                detail="Message cannot be empty"
-            )
-        
-        # Add user message to history
-        redis_memory_service.add_message(session_id, "user", user_message)
-        
-        # Check if currently in booking flow
-        booking_state = redis_memory_service.get_booking_state(session_id)
-        in_booking_flow = bool(booking_state)
-        
-        # Handle booking flow
-        if in_booking_flow:
-            try:
-                # Process booking input
-                response_message, booking_data, is_complete = booking_engine.process_booking_input(
-                    session_id=session_id,
-                    user_input=user_message,
-                    current_state=booking_state
-                )
-                
-                if is_complete:
-                    # Booking completed
-                    redis_memory_service.clear_booking_state(session_id)
-                    redis_memory_service.add_message(session_id, "assistant", response_message)
-                    
-                    return ChatResponse(
-                        session_id=session_id,
-                        user_message=user_message,
-                        assistant_message=response_message,
-                        is_booking_flow=True,
-                        booking_complete=True,
-                        booking_data=booking_data
-                    )
-                else:
-                    # Continue booking flow
-                    redis_memory_service.set_booking_state(session_id, booking_state)
-                    redis_memory_service.add_message(session_id, "assistant", response_message)
-                    
-                    return ChatResponse(
-                        session_id=session_id,
-                        user_message=user_message,
-                        assistant_message=response_message,
-                        is_booking_flow=True,
-                        booking_complete=False,
-                        booking_data=None
-                    )
-            except Exception as e:
-                # If booking fails, clear state and return error
-                redis_memory_service.clear_booking_state(session_id)
-                error_msg = f"Booking process error: {str(e)}. Please start over."
-                redis_memory_service.add_message(session_id, "assistant", error_msg)
-                return ChatResponse(
-                    session_id=session_id,
-                    user_message=user_message,
-                    assistant_message=error_msg,
-                    is_booking_flow=False,
-                    booking_complete=False,
-                    booking_data=None
-                )
-        
-        # Check for booking intent
-        try:
-            if booking_engine.detect_booking_intent(user_message):
-                # Start booking flow
-                response_message = booking_engine.start_booking()
-                
-                # Initialize booking state
-                initial_state = {"step": "name"}
-                redis_memory_service.set_booking_state(session_id, initial_state)
-                redis_memory_service.add_message(session_id, "assistant", response_message)
-                
-                return ChatResponse(
-                    session_id=session_id,
-                    user_message=user_message,
-                    assistant_message=response_message,
-                    is_booking_flow=True,
-                    booking_complete=False,
-                    booking_data=None
-                )
-        except Exception as e:
-            print(f"Booking intent detection error: {e}")
-            # Continue to regular RAG if intent detection fails
+    async with _chat_errors():
+        keys, user_message, booking_response = await _start_turn(
+            request, redis_memory_service, booking_engine
+        )
+        if booking_response is not None:
+            return booking_response
         
         # Regular RAG flow
         try:
-            answer = rag_service.process_query(
-                session_id=session_id,
+            answer = await rag_service.process_query(
+                keys=keys,
                 query=user_message,
                 top_k=request.top_k
             )
@@ -144,30 +235,69 @@ async def chat(request: ChatRequest):
             answer = f"I encountered an error while processing your question: {str(e)}"
         
         # Add assistant response to history
-        redis_memory_service.add_message(session_id, "assistant", answer)
+        await redis_memory_service.record_response(keys, answer)
         
-        return ChatResponse(
-            session_id=session_id,
-            user_message=user_message,
-            assistant_message=answer,
-            is_booking_flow=False,
-            booking_complete=False,
-            booking_data=None
-        )
+        return _build_response(request.session_id, user_message, answer)
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    redis_memory_service=Depends(get_redis_memory),
+    rag_service=Depends(get_rag_service),
+    booking_engine=Depends(get_booking_engine)
+):
+    """
+    Streaming variant of the chat endpoint.
     
-    except HTTPException:
-        raise
-    except Exception as e:
-        # Log the full error for debugging
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Chat processing failed: {str(e)}"
+    RAG answers are streamed as plain text while the LLM generates them.
+    Booking turns are returned whole, with the booking status in the
+    X-Booking-Flow and X-Booking-Complete headers.
+    
+    Args:
+        request: Chat request with session_id and message
+        
+    Returns:
+        Plain text response with the assistant's message
+    """
+    async with _chat_errors():
+        keys, user_message, booking_response = await _start_turn(
+            request, redis_memory_service, booking_engine
         )
+        if booking_response is not None:
+            return PlainTextResponse(
+                booking_response.assistant_message,
+                headers={
+                    "X-Booking-Flow": str(booking_response.is_booking_flow).lower(),
+                    "X-Booking-Complete": str(booking_response.booking_complete).lower()
+                }
+            )
+        
+        async def stream_answer():
+            parts = []
+            try:
+                async for piece in rag_service.stream_query(
+                    keys=keys,
+                    query=user_message,
+                    top_k=request.top_k
+                ):
+                    parts.append(piece)
+                    yield piece
+            except Exception as e:
+                error_msg = f"I encountered an error while processing your question: {str(e)}"
+                parts.append(error_msg)
+                yield error_msg
+            
+            # Add the full assistant response to history once streaming is done
+            await redis_memory_service.record_response(keys, "".join(parts))
+        
+        return StreamingResponse(stream_answer(), media_type="text/plain; charset=utf-8")
 
 @router.get("/chat/history/{session_id}")
-async def get_chat_history(session_id: str, limit: int = 50):
+async def get_chat_history(
+    session_id: str,
+    limit: int = 50,
+    redis_memory_service=Depends(get_redis_memory)
+):
     """
     Retrieve conversation history for a session.
     
@@ -179,7 +309,9 @@ async def get_chat_history(session_id: str, limit: int = 50):
         List of conversation messages
     """
     try:
-        history = redis_memory_service.get_history(session_id, limit=limit)
+        history = await redis_memory_service.get_history(
+            SessionKeys.for_session(session_id), limit=limit
+        )
         return {
             "session_id": session_id,
             "message_count": len(history),
@@ -192,7 +324,10 @@ async def get_chat_history(session_id: str, limit: int = 50):
         )
 
 @router.delete("/chat/session/{session_id}")
-async def clear_session(session_id: str):
+async def clear_session(
+    session_id: str,
+    redis_memory_service=Depends(get_redis_memory)
+):
     """
     Clear all data for a session (conversation history and booking state).
     
@@ -203,7 +338,7 @@ async def clear_session(session_id: str):
         Success confirmation
     """
     try:
-        redis_memory_service.clear_session(session_id)
+        await redis_memory_service.clear_session(SessionKeys.for_session(session_id))
         return {
             "success": True,
             "message": f"Session {session_id} cleared successfully"
@@ -1,18 +1,20 @@
 import os
+import re
 from datetime import datetime, timezone
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Form
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from app.utils.file_utils import save_upload_file, cleanup_file
+from app.utils.file_utils import validate_upload_file
 from app.utils.pdf_to_text import extract_text_from_pdf, extract_text_from_txt
 from app.services.chunking import chunk_text
-from app.services.embeddings import embedding_service
-from app.services.vector_store import vector_store_service
-from app.services.rag import rag_service
+from app.services.registry import get_rag_service, get_vector_store
 
 router = APIRouter()
 
+# Characters not allowed in document IDs
+_DOC_ID_UNSAFE_RE = re.compile(r'[^\w.-]')
+
 class IngestResponse(BaseModel):
     """Response model for document ingestion."""
     success: bool
@@ -21,12 +23,133 @@ class IngestResponse(BaseModel):
     filename: str
     num_chunks: int
     chunking_method: str
+    status: str
     timestamp: str
 
-@router.post("/ingest", response_model=IngestResponse)
+class BatchIngestResponse(BaseModel):
+    """Response model for multi-document ingestion."""
+    success: bool
+    message: str
+    documents: List[IngestResponse]
+
+def _finish_ingest(
+    doc_id: str,
+    filename: str,
+    chunks: List[str],
+    rag_service
+):
+    """
+    Embed and store a document's chunks, then mark it ready.
+    
+    Runs as a background task after the ingest response has been sent;
+    failures are recorded on the document's metadata status, and any
+    batches already uploaded are removed so they can't surface in search.
+    
+    Args:
+        doc_id: Document identifier
+        filename: Original filename
+        chunks: List of text chunks
+        rag_service: RAG service
+    """
+    try:
+        chunk_ids = rag_service.ingest_chunks(doc_id, filename, chunks)
+        rag_service.update_document_status(doc_id, "ready", chunk_ids=chunk_ids)
+    except Exception as e:
+        print(f"Background ingestion failed for {doc_id}: {e}")
+        try:
+            get_vector_store().delete_document_chunks(doc_id)
+        except Exception as cleanup_error:
+            print(f"Failed to remove partial chunks for {doc_id}: {cleanup_error}")
+        rag_service.update_document_status(doc_id, "failed", error=str(e))
+
+def _make_doc_id(filename: str, now: datetime) -> str:
+    """
+    Build the document ID for an upload.
+    
+    Args:
+        filename: Original filename
+        now: Ingestion time
+        
+    Returns:
+        Sanitized filename followed by the ingestion timestamp
+    """
+    safe_filename = _DOC_ID_UNSAFE_RE.sub('_', filename)
+    return f"{safe_filename}_{now:%Y%m%d_%H%M%S}"
+
+def _validate_chunking_method(chunking_method: str):
+    """
+    Validate the requested chunking method.
+    
+    Args:
+        chunking_method: Method for chunking
+        
+    Raises:
+        HTTPException: If the method is not supported
+    """
+    if chunking_method not in ["semantic", "fixed"]:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid chunking method. Must be 'semantic' or 'fixed'."
+        )
+
+def _prepare_document(
+    file: UploadFile,
+    chunking_method: str,
+    now: datetime
+) -> Tuple[str, List[str]]:
+    """
+    Validate an upload, extract its text and chunk it.
+    
+    Args:
+        file: Uploaded file (PDF or TXT)
+        chunking_method: Method for chunking ('semantic' or 'fixed')
+        now: Ingestion time, used in the document ID
+        
+    Returns:
+        Tuple of (doc_id, chunks)
+        
+    Raises:
+        HTTPException: If the file is invalid or yields no usable text
+    """
+    validate_upload_file(file)
+    
+    # Extract text straight from the spooled upload, without a disk copy
+    filename_lower = file.filename.lower()
+    file.file.seek(0)
+    if filename_lower.endswith('.pdf'):
+        text = extract_text_from_pdf(file.file)
+    elif filename_lower.endswith('.txt'):
+        text = extract_text_from_txt(file.file)
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file type. Only PDF and TXT files are supported."
+        )
+    
+    # Validate extracted text
+    if not text or len(text.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to extract sufficient text from {file.filename}. File may be empty or corrupted."
+        )
+    
+    # Chunk the text
+    chunks = chunk_text(text, method=chunking_method)
+    
+    if not chunks:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to create chunks from {file.filename}. File may be too short."
+        )
+    
+    return _make_doc_id(file.filename, now), chunks
+
+@router.post("/ingest", response_model=IngestResponse, status_code=202)
 async def ingest_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="PDF or TXT file to ingest"),
-    chunking_method: str = Form("semantic", description="Chunking method: 'semantic' or 'fixed'")
+    chunking_method: str = Form("semantic", description="Chunking method: 'semantic' or 'fixed'"),
+    rag_service=Depends(get_rag_service)
 ):
     """
     Ingest a document into the RAG system.
@@ -35,9 +158,11 @@ async def ingest_document(
     1. Accepts PDF or TXT file uploads
     2. Extracts text from the file
     3. Chunks the text using the specified method
-    4. Generates embeddings for each chunk
-    5. Stores vectors in Qdrant
-    6. Saves metadata in MongoDB
+    4. Saves metadata in MongoDB with status 'pending'
+    5. Returns 202 Accepted immediately
+    
+    Embedding generation and storage in Qdrant run as a background task,
+    after which the document's status becomes 'ready' (or 'failed').
     
     Args:
         file: Uploaded file (PDF or TXT)
@@ -46,86 +171,40 @@ async def ingest_document(
     Returns:
         Ingestion result with document metadata
     """
-    file_path = None
-    
     try:
-        # Validate chunking method
-        if chunking_method not in ["semantic", "fixed"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid chunking method. Must be 'semantic' or 'fixed'."
-            )
+        _validate_chunking_method(chunking_method)
         
-        # Save uploaded file
-        file_path, unique_filename = save_upload_file(file)
+        now = datetime.now(timezone.utc)
+        doc_id, chunks = _prepare_document(file, chunking_method, now)
         
-        # Extract text based on file type
-        filename_lower = file.filename.lower()
-        if filename_lower.endswith('.pdf'):
-            with open(file_path, 'rb') as f:
-                text = extract_text_from_pdf(f)
-        elif filename_lower.endswith('.txt'):
-            with open(file_path, 'rb') as f:
-                text = extract_text_from_txt(f)
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file type. Only PDF and TXT files are supported."
-            )
-        
-        # Validate extracted text
-        if not text or len(text.strip()) < 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Failed to extract sufficient text from the file. File may be empty or corrupted."
-            )
-        
-        # Chunk the text
-        chunks = chunk_text(text, method=chunking_method)
-        
-        if not chunks:
-            raise HTTPException(
-                status_code=400,
-                detail="Failed to create chunks from the text. File may be too short."
-            )
-        
-        # Generate embeddings
-        vectors = embedding_service.embed_texts(chunks)
-        
-        if len(chunks) != len(vectors):
-            raise HTTPException(
-                status_code=500,
-                detail="Mismatch between number of chunks and vectors."
-            )
-        
-        # Generate unique document ID
-        doc_id = f"{file.filename}_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}"
-        
-        # Store vectors in Qdrant
-        chunk_ids = vector_store_service.store_chunks(
-            doc_id=doc_id,
-            filename=file.filename,
-            chunks=chunks,
-            vectors=vectors
-        )
-        
-        # Save metadata to MongoDB
+        # Save pending metadata to MongoDB
         rag_service.save_document_metadata(
             doc_id=doc_id,
             filename=file.filename,
             num_chunks=len(chunks),
-            chunk_ids=chunk_ids,
-            chunking_method=chunking_method
+            chunk_ids=[],
+            chunking_method=chunking_method,
+            status="pending"
+        )
+        
+        # Embed and store vectors after the response is sent
+        background_tasks.add_task(
+            _finish_ingest,
+            doc_id,
+            file.filename,
+            chunks,
+            rag_service
         )
         
         return IngestResponse(
             success=True,
-            message="Document ingested successfully",
+            message="Document accepted for ingestion",
             doc_id=doc_id,
             filename=file.filename,
             num_chunks=len(chunks),
             chunking_method=chunking_method,
-            timestamp=datetime.now(timezone.utc).isoformat()
+            status="pending",
+            timestamp=now.isoformat()
         )
     
     except HTTPException:
@@ -135,7 +214,92 @@ async def ingest_document(
             status_code=500,
             detail=f"Failed to ingest document: {str(e)}"
         )
-    finally:
-        # Clean up uploaded file
-        if file_path:
-            cleanup_file(file_path)
\ No newline at end of file
+
+@router.post("/ingest/batch", response_model=BatchIngestResponse, status_code=202)
+async def ingest_documents(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="PDF or TXT files to ingest"),
+    chunking_method: str = Form("semantic", description="Chunking method: 'semantic' or 'fixed'"),
+    rag_service=Depends(get_rag_service)
+):
+    """
+    Ingest several documents into the RAG system in one request.
+    
+    Every file is validated, extracted and chunked before anything is
+    saved, so an invalid file rejects the whole batch. Pending metadata
+    for all documents is written to MongoDB in a single insert, and each
+    document is then embedded and stored as its own background task.
+    
+    Args:
+        files: Uploaded files (PDF or TXT)
+        chunking_method: Method for chunking ('semantic' or 'fixed')
+        
+    Returns:
+        Ingestion results with metadata for each document
+    """
+    try:
+        _validate_chunking_method(chunking_method)
+        
+        # Names that sanitize to the same doc_id (e.g. 'a b.txt' and 'a_b.txt')
+        # would share metadata and vector payloads, so reject them up front
+        now = datetime.now(timezone.utc)
+        doc_ids = [_make_doc_id(file.filename, now) for file in files]
+        if len(set(doc_ids)) != len(doc_ids):
+            raise HTTPException(
+                status_code=400,
+                detail="Duplicate filenames in batch. Each file must have a unique name."
+            )
+        
+        prepared = [
+            (file.filename, *_prepare_document(file, chunking_method, now))
+            for file in files
+        ]
+        
+        # Save pending metadata for the whole batch in one round trip
+        rag_service.save_document_metadata_bulk([
+            rag_service.build_document_record(
+                doc_id=doc_id,
+                filename=filename,
+                num_chunks=len(chunks),
+                chunk_ids=[],
+                chunking_method=chunking_method,
+                status="pending"
+            )
+            for filename, doc_id, chunks in prepared
+        ])
+        
+        documents = []
+        for filename, doc_id, chunks in prepared:
+            # Embed and store vectors after the response is sent
+            background_tasks.add_task(
+                _finish_ingest,
+                doc_id,
+                filename,
+                chunks,
+                rag_service
+            )
+            
+            documents.append(IngestResponse(
+                success=True,
+                message="Document accepted for ingestion",
+                doc_id=doc_id,
+                filename=filename,
+                num_chunks=len(chunks),
+                chunking_method=chunking_method,
+                status="pending",
+                timestamp=now.isoformat()
+            ))
+        
+        return BatchIngestResponse(
+            success=True,
+            message=f"{len(documents)} documents accepted for ingestion",
+            documents=documents
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to ingest documents: {str(e)}"
+        )
@@ -1,18 +1,85 @@
 import re
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timezone
-from pymongo import MongoClient
-from groq import Groq
 from app.config import settings
 
+# Input validation patterns
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Booking intent keywords, matched as substrings in a single regex scan
+_BOOKING_KEYWORDS = frozenset({
+    "book", "booking", "interview", "schedule",
+    "appointment", "slot", "meet", "meeting"
+})
+_BOOKING_KW_RE = re.compile("|".join(sorted(map(re.escape, _BOOKING_KEYWORDS))))
+
+# Seconds to wait for the intent classifier before falling back to keywords
+INTENT_LLM_TIMEOUT = 2.0
+
+# Longer messages are treated as questions and never sent to the classifier
+INTENT_LLM_MAX_WORDS = 20
+
+@lru_cache(maxsize=4096)
+def _llm_classify(text_key: str) -> bool:
+    """
+    Classify booking intent with the LLM.
+    
+    Results are cached per normalized message; failed calls raise and
+    are therefore not cached.
+    
+    Args:
+        text_key: Lowercased, whitespace-collapsed user message
+        
+    Returns:
+        True if the LLM classified the message as a booking request
+    """
+    system_prompt = (
+        "You are an intent classifier. Analyze the user's message and determine "
+        "if they want to book an interview or schedule an appointment. "
+        "Respond with ONLY one word: BOOKING or OTHER"
+    )
+    
+    # No SDK retries, so a hung call falls back to keywords after one timeout
+    client = booking_engine.groq_client.with_options(
+        max_retries=0, timeout=INTENT_LLM_TIMEOUT
+    )
+    response = client.chat.completions.create(
+        model=settings.MODEL_NAME,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"User message: \"{text_key}\""}
+        ],
+        temperature=0.0,
+        max_tokens=10
+    )
+    
+    classification = response.choices[0].message.content.strip().upper()
+    return "BOOK" in classification
+
 class BookingEngine:
     """State machine for handling interview booking flow."""
     
     def __init__(self):
-        self.mongo_client = MongoClient(settings.MONGODB_URI)
-        self.db = self.mongo_client[settings.MONGO_DB_NAME]
-        self.bookings_collection = self.db[settings.MONGO_BOOKINGS_COLLECTION]
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
+        # Clients are created on first use so importing the engine stays cheap
+        self._mongo_client = None
+        self._bookings_collection = None
+    
+    @property
+    def groq_client(self):
+        """Shared Groq client, created on first access."""
+        from app.services.registry import get_groq_client
+        return get_groq_client()
+    
+    @property
+    def bookings_collection(self):
+        """MongoDB bookings collection, connected on first access."""
+        if self._bookings_collection is None:
+            from pymongo import AsyncMongoClient
+            self._mongo_client = AsyncMongoClient(settings.MONGODB_URI)
+            db = self._mongo_client[settings.MONGO_DB_NAME]
+            self._bookings_collection = db[settings.MONGO_BOOKINGS_COLLECTION]
+        return self._bookings_collection
     
     def detect_booking_intent(self, user_text: str) -> bool:
         """
@@ -25,37 +92,19 @@ class BookingEngine:
             True if booking intent detected
         """
         # Keyword-based detection
-        keywords = {
-            "book", "booking", "interview", "schedule", 
-            "appointment", "slot", "meet", "meeting"
-        }
         text_lower = user_text.lower()
-        keyword_match = any(keyword in text_lower for keyword in keywords)
+        if _BOOKING_KW_RE.search(text_lower):
+            return True
+        
+        # LLM-based intent classification, only for short messages
+        words = text_lower.split()
+        if len(words) > INTENT_LLM_MAX_WORDS:
+            return False
         
-        # LLM-based intent classification
         try:
-            system_prompt = (
-                "You are an intent classifier. Analyze the user's message and determine "
-                "if they want to book an interview or schedule an appointment. "
-                "Respond with ONLY one word: BOOKING or OTHER"
-            )
-            
-            response = self.groq_client.chat.completions.create(
-                model=settings.MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"User message: \"{user_text}\""}
-                ],
-                temperature=0.0,
-                max_tokens=10
-            )
-            
-            classification = response.choices[0].message.content.strip().upper()
-            llm_match = "BOOK" in classification
-            
-            return llm_match or keyword_match
+            return _llm_classify(" ".join(words))
         except Exception:
-            return keyword_match
+            return False
     
     def start_booking(self) -> str:
         """
@@ -69,7 +118,7 @@ class BookingEngine:
             "Please provide your **full name**."
         )
     
-    def process_booking_input(
+    async def process_booking_input(
         self, 
         session_id: str, 
         user_input: str, 
@@ -95,7 +144,7 @@ class BookingEngine:
         elif step == "date":
             return self._process_date(user_input, current_state)
         elif step == "time":
-            return self._process_time(user_input, current_state)
+            return await self._process_time(user_input, current_state)
         
         return "Invalid booking state. Please start over.", None, False
     
@@ -124,8 +173,7 @@ class BookingEngine:
         email = user_input.strip()
         
         # Validate email format
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
+        if not _EMAIL_RE.match(email):
             return (
                 "That doesn't look like a valid email address. "
                 "Please provide a valid email (e.g., user@example.com).",
@@ -151,24 +199,22 @@ class BookingEngine:
         """Process date input."""
         date_str = user_input.strip()
         
-        # Validate date format
-        date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-        if not re.match(date_pattern, date_str):
+        # Validate date format and value in a single parse
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
             return (
                 "Invalid date format. Please use YYYY-MM-DD format (e.g., 2025-11-20).",
                 None,
                 False
             )
         
-        # Validate date is valid and in the future
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            if date_obj.date() < datetime.now().date():
-                return "Please provide a future date.", None, False
-        except ValueError:
-            return "Invalid date. Please provide a valid date in YYYY-MM-DD format.", None, False
+        # Validate date is in the future
+        if date_obj.date() < datetime.now().date():
+            return "Please provide a future date.", None, False
         
-        state["date"] = date_str
+        # Store zero-padded, since strptime also accepts e.g. 2025-1-5
+        state["date"] = date_obj.strftime("%Y-%m-%d")
         state["step"] = "time"
         
         return (
@@ -178,7 +224,7 @@ class BookingEngine:
             False
         )
     
-    def _process_time(
+    async def _process_time(
         self, 
         user_input: str, 
         state: Dict
@@ -186,25 +232,21 @@ class BookingEngine:
         """Process time input and complete booking."""
         time_str = user_input.strip()
         
-        # Validate time format
-        time_pattern = r'^\d{2}:\d{2}$'
-        if not re.match(time_pattern, time_str):
+        # Validate time format and value in a single parse
+        try:
+            time_obj = datetime.strptime(time_str, "%H:%M")
+        except ValueError:
             return (
                 "Invalid time format. Please use HH:MM format in 24-hour notation (e.g., 14:30).",
                 None,
                 False
             )
         
-        # Validate time is valid
-        try:
-            time_obj = datetime.strptime(time_str, "%H:%M")
-        except ValueError:
-            return "Invalid time. Please provide a valid time in HH:MM format.", None, False
-        
-        state["time"] = time_str
+        # Store zero-padded, since strptime also accepts e.g. 9:05
+        state["time"] = time_obj.strftime("%H:%M")
         
         # Save booking to database
-        booking_data = self._save_booking(state)
+        booking_data = await self._save_booking(state)
         
         response = (
             "🎉 **Booking Confirmed!**\n\n"
@@ -218,7 +260,7 @@ class BookingEngine:
         
         return response, booking_data, True
     
-    def _save_booking(self, booking_info: Dict) -> Dict:
+    async def _save_booking(self, booking_info: Dict) -> Dict:
         """
         Save booking to MongoDB.
         
@@ -242,18 +284,11 @@ class BookingEngine:
                 "created_at": now
             }
             
-            self.bookings_collection.insert_one(booking_record)
+            await self.bookings_collection.insert_one(booking_record)
             
-            # Return serializable version
-            return {
-                "booking_id": booking_id,
-                "name": booking_info["name"],
-                "email": booking_info["email"],
-                "date": booking_info["date"],
-                "time": booking_info["time"],
-                "status": "confirmed",
-                "created_at": now.isoformat()
-            }
+            # insert_one adds the ObjectId; the datetime is encoded by the response
+            booking_record.pop("_id", None)
+            return booking_record
         except Exception as e:
             raise RuntimeError(f"Failed to save booking: {str(e)}")
 
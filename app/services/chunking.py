@@ -1,6 +1,22 @@
 import re
 from typing import List
-from app.config import settings
+from app.config import CHUNK_SIZE, CHUNK_OVERLAP
+
+try:
+    import chonkie_core
+except ImportError:
+    chonkie_core = None
+
+# Sentence boundaries for the chonkie-core fast path: terminal punctuation
+# followed by whitespace (as in the regex fallback), plus paragraph breaks,
+# so decimals, URLs and PDF line wraps are not treated as sentence ends
+_SENTENCE_PATTERNS = [
+    punct + space for punct in (b".", b"?", b"!") for space in (b" ", b"\n", b"\t", b"\r")
+] + [b"\n\n"]
+
+# Paragraph and sentence split patterns for the regex fallback
+_PARA_RE = re.compile(r'\n{2,}')
+_SENT_RE = re.compile(r'(?<=[\.\?\!])\s+')
 
 def chunk_text_fixed(
     text: str, 
@@ -19,35 +35,53 @@ def chunk_text_fixed(
         List of text chunks
     """
     if chunk_size is None:
-        chunk_size = settings.CHUNK_SIZE
+        chunk_size = CHUNK_SIZE
     if overlap is None:
-        overlap = settings.CHUNK_OVERLAP
+        overlap = CHUNK_OVERLAP
     
-    chunks = []
-    text_length = len(text)
-    position = 0
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("Chunk size must be greater than overlap")
+    
+    chunks = (
+        text[position:position + chunk_size].strip()
+        for position in range(0, len(text), step)
+    )
+    return [chunk for chunk in chunks if chunk]
+
+def _split_sentences_fast(text: str, chunk_size: int) -> List[str]:
+    """
+    Pack sentences into chunks using chonkie-core's SIMD boundary scan.
     
-    while position < text_length:
-        end_position = min(position + chunk_size, text_length)
-        chunk = text[position:end_position].strip()
+    Args:
+        text: Input text
+        chunk_size: Target size of each chunk in bytes
         
+    Returns:
+        List of text chunks, before overlap is applied
+    """
+    data = text.encode("utf-8")
+    data_length = len(data)
+    offsets = chonkie_core.chunk_offsets(data, size=chunk_size, patterns=_SENTENCE_PATTERNS)
+    
+    chunks = []
+    start = 0
+    for _, end in offsets:
+        # Hard splits inside long sentences may land mid-character
+        while end < data_length and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        chunk = data[start:end].decode("utf-8").strip()
         if chunk:
             chunks.append(chunk)
-        
-        position += chunk_size - overlap
-        
-        if position >= text_length:
-            break
+        start = end
     
     return chunks
 
-def chunk_text_semantic(
-    text: str, 
-    chunk_size: int = None, 
-    overlap: int = None
-) -> List[str]:
+def _split_sentences(text: str, chunk_size: int, overlap: int) -> List[str]:
     """
-    Split text into semantic chunks based on paragraphs and sentences.
+    Pack sentences into chunks using regex paragraph and sentence splitting.
+    
+    Fallback for when chonkie-core is not installed.
     
     Args:
         text: Input text
@@ -55,20 +89,15 @@ def chunk_text_semantic(
         overlap: Overlap between chunks
         
     Returns:
-        List of text chunks
+        List of text chunks, before overlap is applied
     """
-    if chunk_size is None:
-        chunk_size = settings.CHUNK_SIZE
-    if overlap is None:
-        overlap = settings.CHUNK_OVERLAP
-    
     # Split into paragraphs
-    paragraphs = [p.strip() for p in re.split(r'\n{2,}', text) if p.strip()]
+    paragraphs = [p.strip() for p in _PARA_RE.split(text) if p.strip()]
     
     # Split paragraphs into sentences
     sentences = []
     for paragraph in paragraphs:
-        sentence_list = re.split(r'(?<=[\.\?\!])\s+', paragraph)
+        sentence_list = _SENT_RE.split(paragraph)
         for sentence in sentence_list:
             sentence = sentence.strip()
             if sentence:
@@ -77,43 +106,73 @@ def chunk_text_semantic(
     if not sentences:
         return [text] if text.strip() else []
     
-    # Build chunks from sentences
+    # Build chunks from sentences, joining each chunk's parts only once
     chunks = []
-    current_chunk = ""
+    current_parts = []
+    current_len = 0
     
     for sentence in sentences:
-        potential_chunk = (current_chunk + " " + sentence).strip() if current_chunk else sentence
+        sentence_len = len(sentence)
+        candidate_len = current_len + 1 + sentence_len if current_parts else sentence_len
         
-        if len(potential_chunk) <= chunk_size:
-            current_chunk = potential_chunk
+        if candidate_len <= chunk_size:
+            current_parts.append(sentence)
+            current_len = candidate_len
         else:
-            if current_chunk:
-                chunks.append(current_chunk)
+            if current_parts:
+                chunks.append(" ".join(current_parts))
             
             # Handle very long sentences
-            if len(sentence) > chunk_size:
-                for i in range(0, len(sentence), chunk_size - overlap):
+            if sentence_len > chunk_size:
+                for i in range(0, sentence_len, chunk_size - overlap):
                     part = sentence[i:i + (chunk_size - overlap)].strip()
                     if part:
                         chunks.append(part)
-                current_chunk = ""
+                current_parts = []
+                current_len = 0
             else:
-                current_chunk = sentence
+                current_parts = [sentence]
+                current_len = sentence_len
     
-    if current_chunk:
-        chunks.append(current_chunk)
+    if current_parts:
+        chunks.append(" ".join(current_parts))
+    
+    return chunks
+
+def chunk_text_semantic(
+    text: str, 
+    chunk_size: int = None, 
+    overlap: int = None
+) -> List[str]:
+    """
+    Split text into semantic chunks based on paragraphs and sentences.
+    
+    Args:
+        text: Input text
+        chunk_size: Target size of each chunk
+        overlap: Overlap between chunks
+        
+    Returns:
+        List of text chunks
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    if overlap is None:
+        overlap = CHUNK_OVERLAP
+    
+    # Pack sentences into chunks
+    if chonkie_core is not None:
+        chunks = _split_sentences_fast(text, chunk_size)
+    else:
+        chunks = _split_sentences(text, chunk_size, overlap)
     
     # Apply overlap if needed
     if overlap > 0 and len(chunks) > 1:
-        overlapped_chunks = []
-        for i, chunk in enumerate(chunks):
-            if i == 0:
-                overlapped_chunks.append(chunk)
-            else:
-                previous_chunk = overlapped_chunks[-1]
-                tail = previous_chunk[-overlap:] if len(previous_chunk) >= overlap else previous_chunk
-                new_chunk = (tail + " " + chunk).strip()
-                overlapped_chunks.append(new_chunk)
+        overlapped_chunks = [chunks[0]]
+        for chunk in chunks[1:]:
+            # Slicing yields the whole chunk when it is shorter than the overlap
+            tail = overlapped_chunks[-1][-overlap:]
+            overlapped_chunks.append(" ".join((tail, chunk)).strip())
         chunks = overlapped_chunks
     
     return chunks
@@ -1,23 +1,115 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from typing import List
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import torch
+from app.config import settings
 
 class EmbeddingService:
-    """Service for generating text embeddings."""
+    """
+    Service for generating text embeddings.
+    
+    Embeddings are L2-normalized, so dot product equals cosine similarity.
+    """
     
     _instance = None
     _model = None
+    _queue = None
+    _batch_size = 32
+    _lowercase = False
+    # The HF fast tokenizer is not safe to call from several threads at once,
+    # and queries (batcher thread) and ingests (task threads) both encode
+    _encode_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(EmbeddingService, cls).__new__(cls)
-            cls._model = SentenceTransformer('all-MiniLM-L6-v2')
+            cls._model = cls._load_model()
+            # Attention cost grows quadratically with length; queries and
+            # CHUNK_SIZE chunks fit well within this cap
+            cls._model.max_seq_length = settings.EMBEDDING_MAX_SEQ_LENGTH
+            cls._lowercase = bool(getattr(cls._model.tokenizer, "do_lower_case", False))
+            cls._queue = queue.Queue()
+            threading.Thread(
+                target=cls._instance._batch_worker,
+                name="embedding-batcher",
+                daemon=True
+            ).start()
         return cls._instance
     
+    @classmethod
+    def _load_model(cls) -> SentenceTransformer:
+        """
+        Load the embedding model with the configured backend.
+        
+        The 'onnx' backend runs the model through ONNX Runtime using the
+        pre-quantized INT8 export published alongside the model weights.
+        The 'torch' backend uses the GPU in half precision when CUDA is
+        available, with a larger encode batch size for bulk ingestion.
+        
+        Returns:
+            Loaded SentenceTransformer model
+        """
+        if settings.EMBEDDING_BACKEND == "onnx":
+            return SentenceTransformer(
+                settings.EMBEDDING_MODEL,
+                backend="onnx",
+                model_kwargs={"file_name": settings.EMBEDDING_ONNX_FILE}
+            )
+        
+        if torch.cuda.is_available():
+            model = SentenceTransformer(settings.EMBEDDING_MODEL, device="cuda")
+            model.half()
+            cls._batch_size = 256
+            return model
+        
+        return SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu")
+    
+    def _batch_worker(self):
+        """
+        Encode queued single-text requests together.
+        
+        Waits for a request, then collects more for up to EMBED_QUEUE_WINDOW_MS
+        (or until EMBED_QUEUE_BATCH_SIZE requests) and encodes them in one
+        forward pass, resolving each caller's future with its vector.
+        """
+        window = settings.EMBED_QUEUE_WINDOW_MS / 1000
+        
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + window
+            
+            while len(batch) < settings.EMBED_QUEUE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            
+            try:
+                with self._encode_lock:
+                    embeddings = self._model.encode(
+                        [text for text, _ in batch],
+                        show_progress_bar=False,
+                        normalize_embeddings=True
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding.tolist())
+    
     def embed_text(self, text: str) -> List[float]:
         """
         Generate embedding for a single text.
         
+        Concurrent calls are coalesced into a single batched forward pass,
+        so this blocks until the batch containing the text is encoded.
+        
         Args:
             text: Input text
             
@@ -27,10 +119,11 @@ class EmbeddingService:
         if not text or not text.strip():
             raise ValueError("Cannot embed empty text")
         
-        embedding = self._model.encode(text, show_progress_bar=False)
-        return embedding.tolist()
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts.
         
@@ -38,19 +131,23 @@ class EmbeddingService:
             texts: List of input texts
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (n, dim), one row per non-empty text
         """
-        if not texts:
-            return []
-        
         # Filter out empty texts
         valid_texts = [t for t in texts if t and t.strip()]
         
         if not valid_texts:
-            return []
+            return np.empty((0, self.get_embedding_dimension()), dtype=np.float32)
         
-        embeddings = self._model.encode(valid_texts, show_progress_bar=False)
-        return embeddings.tolist()
+        with self._encode_lock:
+            embeddings = self._model.encode(
+                valid_texts,
+                batch_size=self._batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        return embeddings.astype(np.float32, copy=False)
     
     def get_embedding_dimension(self) -> int:
         """
@@ -60,6 +157,15 @@ class EmbeddingService:
             Embedding dimension
         """
         return self._model.get_sentence_embedding_dimension()
+    
+    def lowercases_input(self) -> bool:
+        """
+        Check whether the model's tokenizer lowercases text before encoding.
+        
+        Returns:
+            True if the model is uncased
+        """
+        return self._lowercase
 
 # Singleton instance
 embedding_service = EmbeddingService()
\ No newline at end of file
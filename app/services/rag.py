@@ -1,31 +1,94 @@
-from typing import List, Dict, Optional
-from groq import Groq
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
 from pymongo import MongoClient
+from starlette.concurrency import iterate_in_threadpool
 from datetime import datetime, timezone
 from app.config import settings
-from app.services.embeddings import embedding_service
-from app.services.vector_store import vector_store_service
-from app.services.redis_memory import redis_memory_service
+from app.services.redis_memory import redis_memory_service, SessionKeys
+from app.services.registry import get_embedding_service, get_vector_store, get_groq_client
+
+NO_DOCUMENTS_MESSAGE = (
+    "I don't have any documents in my knowledge base yet. "
+    "Please upload documents first using the /ingest endpoint."
+)
+
+# Fields returned when listing documents; chunk_ids can be large and is left out
+DOCUMENT_PROJECTION = {
+    "_id": 0,
+    "doc_id": 1,
+    "filename": 1,
+    "num_chunks": 1,
+    "chunking_method": 1,
+    "status": 1,
+    "timestamp": 1
+}
+
+SYSTEM_PROMPT = (
+    "You are a helpful and knowledgeable assistant. Your task is to answer questions "
+    "based on the provided context from documents.\n\n"
+    "Guidelines:\n"
+    "- Use the context to provide accurate and relevant answers\n"
+    "- If the exact answer isn't in the context but related information is present, "
+    "use that information to provide a helpful response\n"
+    "- Only say 'I don't know' or 'The information is not available' if the context "
+    "is completely unrelated to the question\n"
+    "- Be concise, clear, and accurate\n"
+    "- Cite sources when appropriate (e.g., 'According to the document...')\n"
+    "- If asked about information not in the context, be honest about it"
+)
+
+@lru_cache(maxsize=2048)
+def _embed_query_cached(text_norm: str) -> Tuple[float, ...]:
+    """
+    Embed a normalized query, reusing the vector for repeated queries.
+    
+    Args:
+        text_norm: Whitespace-collapsed query text, lowercased for uncased models
+        
+    Returns:
+        Embedding vector as a tuple of floats
+    """
+    return tuple(get_embedding_service().embed_text(text_norm))
 
 class RAGService:
     """Service for RAG pipeline operations."""
     
     def __init__(self):
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
+        self.groq_client = get_groq_client()
         self.mongo_client = MongoClient(settings.MONGODB_URI)
         self.db = self.mongo_client[settings.MONGO_DB_NAME]
         self.docs_collection = self.db[settings.MONGO_DOCS_COLLECTION]
+        # The service is built by the first request that needs it; creating
+        # indexes can block for the full server-selection timeout when
+        # MongoDB is unreachable, so don't make that request wait on it
+        threading.Thread(
+            target=self._ensure_indexes,
+            name="mongo-indexes",
+            daemon=True
+        ).start()
     
-    def save_document_metadata(
+    def _ensure_indexes(self):
+        """Create the indexes used for listing and looking up documents."""
+        try:
+            self.docs_collection.create_index([("timestamp", -1)])
+            self.docs_collection.create_index("doc_id")
+        except Exception as e:
+            print(f"Could not create document indexes: {str(e)}")
+    
+    def build_document_record(
         self, 
         doc_id: str, 
         filename: str, 
         num_chunks: int, 
         chunk_ids: List[str],
-        chunking_method: str
-    ):
+        chunking_method: str,
+        status: str = "ready"
+    ) -> Dict:
         """
-        Save document metadata to MongoDB.
+        Build a document metadata record.
         
         Args:
             doc_id: Document identifier
@@ -33,18 +96,136 @@ class RAGService:
             num_chunks: Number of chunks created
             chunk_ids: List of chunk IDs
             chunking_method: Method used for chunking
+            status: Ingestion status ('pending', 'ready' or 'failed')
+            
+        Returns:
+            Document record
         """
-        record = {
+        return {
             "doc_id": doc_id,
             "filename": filename,
             "num_chunks": num_chunks,
             "chunk_ids": chunk_ids,
             "chunking_method": chunking_method,
+            "status": status,
             "timestamp": datetime.now(timezone.utc)
         }
+    
+    def save_document_metadata(
+        self, 
+        doc_id: str, 
+        filename: str, 
+        num_chunks: int, 
+        chunk_ids: List[str],
+        chunking_method: str,
+        status: str = "ready"
+    ):
+        """
+        Save document metadata to MongoDB.
+        
+        Args:
+            doc_id: Document identifier
+            filename: Original filename
+            num_chunks: Number of chunks created
+            chunk_ids: List of chunk IDs
+            chunking_method: Method used for chunking
+            status: Ingestion status ('pending', 'ready' or 'failed')
+        """
+        record = self.build_document_record(
+            doc_id, filename, num_chunks, chunk_ids, chunking_method, status
+        )
         
         self.docs_collection.insert_one(record)
     
+    def save_document_metadata_bulk(self, records: List[Dict]):
+        """
+        Save several document metadata records in one round trip.
+        
+        Args:
+            records: Records built with build_document_record
+        """
+        if records:
+            self.docs_collection.insert_many(records, ordered=False)
+    
+    def update_document_status(
+        self, 
+        doc_id: str, 
+        status: str, 
+        chunk_ids: Optional[List[str]] = None,
+        error: Optional[str] = None
+    ):
+        """
+        Update the ingestion status of a document.
+        
+        Args:
+            doc_id: Document identifier
+            status: New status ('ready' or 'failed')
+            chunk_ids: List of chunk IDs, once stored
+            error: Error message if ingestion failed
+        """
+        update = {"status": status}
+        if chunk_ids is not None:
+            update["chunk_ids"] = chunk_ids
+        if error is not None:
+            update["error"] = error
+        
+        self.docs_collection.update_one({"doc_id": doc_id}, {"$set": update})
+    
+    def ingest_chunks(
+        self, 
+        doc_id: str, 
+        filename: str, 
+        chunks: List[str]
+    ) -> List[str]:
+        """
+        Embed document chunks and store them in the vector store.
+        
+        Chunks are processed in batches of INGEST_BATCH_SIZE. While one batch
+        is being embedded, the previous one is uploaded on a worker thread,
+        so total time approaches max(embed, upload) rather than their sum.
+        Only the final upload waits for Qdrant to apply it.
+        
+        Args:
+            doc_id: Document identifier
+            filename: Original filename
+            chunks: List of text chunks
+            
+        Returns:
+            List of chunk IDs
+        """
+        embedding_service = get_embedding_service()
+        vector_store_service = get_vector_store()
+        batch_size = settings.INGEST_BATCH_SIZE
+        chunk_ids = []
+        pending = None
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for start in range(0, len(chunks), batch_size):
+                batch = chunks[start:start + batch_size]
+                vectors = embedding_service.embed_texts(batch)
+                
+                if len(batch) != len(vectors):
+                    raise ValueError("Mismatch between number of chunks and vectors.")
+                
+                # Keep at most one upload in flight
+                if pending is not None:
+                    chunk_ids.extend(pending.result())
+                
+                pending = executor.submit(
+                    vector_store_service.store_chunks,
+                    doc_id=doc_id,
+                    filename=filename,
+                    chunks=batch,
+                    vectors=vectors,
+                    start_idx=start,
+                    wait=start + batch_size >= len(chunks)
+                )
+            
+            if pending is not None:
+                chunk_ids.extend(pending.result())
+        
+        return chunk_ids
+    
     def search_documents(
         self, 
         query: str, 
@@ -60,11 +241,15 @@ class RAGService:
         Returns:
             List of relevant chunks with metadata
         """
-        # Generate query embedding
-        query_vector = embedding_service.embed_text(query)
+        # Generate query embedding; collapsing whitespace doesn't change the
+        # tokens, and lowercasing doesn't either when the model is uncased
+        text_norm = " ".join(query.split())
+        if get_embedding_service().lowercases_input():
+            text_norm = text_norm.lower()
+        query_vector = list(_embed_query_cached(text_norm))
         
         # Search in vector store
-        results = vector_store_service.search_similar(query_vector, top_k=top_k)
+        results = get_vector_store().search_similar(query_vector, top_k=top_k)
         
         return results
     
@@ -81,27 +266,24 @@ class RAGService:
         if not search_results:
             return "No relevant information found in the knowledge base."
         
-        context_parts = []
-        for idx, result in enumerate(search_results, 1):
-            filename = result.get("filename", "Unknown")
-            chunk_idx = result.get("chunk_idx", "?")
-            text = result.get("text", "")
-            score = result.get("score", 0.0)
-            
-            context_parts.append(
-                f"[Source {idx}: {filename}, Chunk {chunk_idx}, Relevance: {score:.2f}]\n{text}"
-            )
+        # Results carry every key, but values may be None (e.g. a missing score)
+        context_parts = [
+            f"[Source {idx}: {result['filename'] or 'Unknown'}, "
+            f"Chunk {'?' if result['chunk_idx'] is None else result['chunk_idx']}, "
+            f"Relevance: {result['score'] or 0.0:.2f}]\n{result['text']}"
+            for idx, result in enumerate(search_results, 1)
+        ]
         
         return "\n\n---\n\n".join(context_parts)
     
-    def generate_answer(
+    def _build_messages(
         self, 
         question: str, 
         context: str, 
         conversation_history: List[Dict]
-    ) -> str:
+    ) -> List[Dict]:
         """
-        Generate answer using LLM with context and history.
+        Build the LLM message list from context and history.
         
         Args:
             question: User's question
@@ -109,24 +291,9 @@ class RAGService:
             conversation_history: Recent conversation history
             
         Returns:
-            Generated answer
+            List of chat messages
         """
-        system_prompt = (
-            "You are a helpful and knowledgeable assistant. Your task is to answer questions "
-            "based on the provided context from documents.\n\n"
-            "Guidelines:\n"
-            "- Use the context to provide accurate and relevant answers\n"
-            "- If the exact answer isn't in the context but related information is present, "
-            "use that information to provide a helpful response\n"
-            "- Only say 'I don't know' or 'The information is not available' if the context "
-            "is completely unrelated to the question\n"
-            "- Be concise, clear, and accurate\n"
-            "- Cite sources when appropriate (e.g., 'According to the document...')\n"
-            "- If asked about information not in the context, be honest about it"
-        )
-        
-        # Build messages
-        messages = [{"role": "system", "content": system_prompt}]
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
         
         # Add conversation history (last 12 messages for context)
         if conversation_history:
@@ -136,6 +303,27 @@ class RAGService:
         user_message = f"Context from documents:\n\n{context}\n\n---\n\nQuestion: {question}"
         messages.append({"role": "user", "content": user_message})
         
+        return messages
+    
+    def generate_answer(
+        self, 
+        question: str, 
+        context: str, 
+        conversation_history: List[Dict]
+    ) -> str:
+        """
+        Generate answer using LLM with context and history.
+        
+        Args:
+            question: User's question
+            context: Retrieved context
+            conversation_history: Recent conversation history
+            
+        Returns:
+            Generated answer
+        """
+        messages = self._build_messages(question, context, conversation_history)
+        
         try:
             response = self.groq_client.chat.completions.create(
                 model=settings.MODEL_NAME,
@@ -149,58 +337,150 @@ class RAGService:
         except Exception as e:
             return f"Error generating response: {str(e)}"
     
-    def process_query(
+    def generate_answer_stream(
+        self, 
+        question: str, 
+        context: str, 
+        conversation_history: List[Dict]
+    ) -> Iterator[str]:
+        """
+        Generate answer using LLM, yielding text as it is produced.
+        
+        Args:
+            question: User's question
+            context: Retrieved context
+            conversation_history: Recent conversation history
+            
+        Yields:
+            Pieces of the generated answer
+        """
+        messages = self._build_messages(question, context, conversation_history)
+        
+        try:
+            stream = self.groq_client.chat.completions.create(
+                model=settings.MODEL_NAME,
+                messages=messages,
+                temperature=0.2,
+                max_tokens=800,
+                stream=True,
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
+    
+    async def _retrieve(
         self, 
-        session_id: str, 
+        keys: SessionKeys, 
         query: str, 
-        top_k: int = 5
-    ) -> str:
+        top_k: int
+    ) -> Optional[Tuple[str, List[Dict]]]:
         """
-        Process a RAG query end-to-end.
+        Retrieve the context and conversation history for a query.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             query: User's query
             top_k: Number of chunks to retrieve
             
         Returns:
-            Generated answer
+            Tuple of (context, conversation_history), or None if nothing matched
         """
         # Search for relevant chunks
-        search_results = self.search_documents(query, top_k=top_k)
+        search_results = await asyncio.to_thread(self.search_documents, query, top_k)
         
         if not search_results:
-            return (
-                "I don't have any documents in my knowledge base yet. "
-                "Please upload documents first using the /ingest endpoint."
-            )
+            return None
         
         # Build context from results
         context = self.build_context(search_results)
         
         # Get conversation history
-        conversation_history = redis_memory_service.get_conversation_context(session_id)
+        conversation_history = await redis_memory_service.get_conversation_context(keys)
+        
+        return context, conversation_history
+    
+    async def process_query(
+        self, 
+        keys: SessionKeys, 
+        query: str, 
+        top_k: int = 5
+    ) -> str:
+        """
+        Process a RAG query end-to-end.
+        
+        Embedding, vector search and LLM generation are blocking calls and
+        run in worker threads so the event loop stays free.
+        
+        Args:
+            keys: Session keys
+            query: User's query
+            top_k: Number of chunks to retrieve
+            
+        Returns:
+            Generated answer
+        """
+        retrieved = await self._retrieve(keys, query, top_k)
+        if retrieved is None:
+            return NO_DOCUMENTS_MESSAGE
+        
+        context, conversation_history = retrieved
         
         # Generate answer
-        answer = self.generate_answer(query, context, conversation_history)
+        answer = await asyncio.to_thread(
+            self.generate_answer, query, context, conversation_history
+        )
         
         return answer
     
+    async def stream_query(
+        self, 
+        keys: SessionKeys, 
+        query: str, 
+        top_k: int = 5
+    ) -> AsyncIterator[str]:
+        """
+        Process a RAG query end-to-end, streaming the answer.
+        
+        The blocking Groq stream is consumed in a worker thread one chunk
+        at a time, so the first tokens reach the client without waiting
+        for the full completion.
+        
+        Args:
+            keys: Session keys
+            query: User's query
+            top_k: Number of chunks to retrieve
+            
+        Yields:
+            Pieces of the generated answer
+        """
+        retrieved = await self._retrieve(keys, query, top_k)
+        if retrieved is None:
+            yield NO_DOCUMENTS_MESSAGE
+            return
+        
+        context, conversation_history = retrieved
+        
+        async for piece in iterate_in_threadpool(
+            self.generate_answer_stream(query, context, conversation_history)
+        ):
+            yield piece
+    
     def get_all_documents(self) -> List[Dict]:
         """
-        Get all document metadata.
+        Get all document metadata, newest first.
         
         Returns:
-            List of document records
+            List of document records with ISO-formatted timestamps
         """
-        documents = list(self.docs_collection.find({}, {"_id": 0}))
-        
-        # Convert datetime to string
-        for doc in documents:
-            if "timestamp" in doc:
-                doc["timestamp"] = doc["timestamp"].isoformat()
+        cursor = self.docs_collection.find({}, DOCUMENT_PROJECTION).sort("timestamp", -1)
         
-        return documents
+        return [
+            {**doc, "timestamp": doc["timestamp"].isoformat()} if "timestamp" in doc else doc
+            for doc in cursor
+        ]
 
 # Singleton instance
 rag_service = RAGService()
\ No newline at end of file
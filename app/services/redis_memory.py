@@ -1,89 +1,149 @@
-import json
-from typing import List, Dict
+import orjson
+import msgpack
+from dataclasses import dataclass
+from typing import List, Dict, Optional
 from datetime import datetime, timezone
-import redis
-from app.config import settings
+from redis import asyncio as aioredis
+from app.config import settings, REDIS_TTL
+
+@dataclass(frozen=True, slots=True)
+class SessionKeys:
+    """Redis keys for a session, computed once per request."""
+    history: bytes
+    booking_state: bytes
+    
+    @classmethod
+    def for_session(cls, session_id: str) -> "SessionKeys":
+        """
+        Build the keys for a session.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Session keys
+        """
+        return cls(
+            history=f"session:{session_id}".encode(),
+            booking_state=f"booking_state:{session_id}".encode()
+        )
 
 class RedisMemoryService:
     """Service for managing conversation memory in Redis."""
     
     def __init__(self):
-        self.client = redis.Redis(
+        self.client = aioredis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             password=settings.REDIS_PASSWORD,
             username="default",
-            decode_responses=True
+            decode_responses=False
         )
-        self.ttl = settings.REDIS_TTL
+        self.ttl = REDIS_TTL
     
-    def _get_session_key(self, session_id: str) -> str:
-        """Generate Redis key for session."""
-        return f"session:{session_id}"
+    def pipeline(self) -> aioredis.client.Pipeline:
+        """
+        Create a non-transactional pipeline for batching commands.
+        
+        Returns:
+            Redis pipeline
+        """
+        return self.client.pipeline(transaction=False)
+    
+    def _encode_message(self, role: str, content: str) -> bytes:
+        """Serialize a conversation message with the current timestamp."""
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        return msgpack.packb(message, use_bin_type=True)
     
-    def _get_booking_state_key(self, session_id: str) -> str:
-        """Generate Redis key for booking state."""
-        return f"booking_state:{session_id}"
+    def _decode_message(self, raw: bytes) -> Dict:
+        """Deserialize a conversation message, accepting legacy JSON entries."""
+        try:
+            return msgpack.unpackb(raw, raw=False)
+        except ValueError:
+            return orjson.loads(raw)
     
-    def add_message(self, session_id: str, role: str, content: str):
+    async def add_message(self, keys: SessionKeys, role: str, content: str):
         """
         Add a message to conversation history.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             role: Message role ('user' or 'assistant')
             content: Message content
         """
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        async with self.pipeline() as pipe:
+            pipe.rpush(keys.history, self._encode_message(role, content))
+            pipe.expire(keys.history, self.ttl)
+            await pipe.execute()
+    
+    async def record_response(
+        self, 
+        keys: SessionKeys, 
+        content: str, 
+        booking_state: Optional[Dict] = None,
+        clear_booking: bool = False
+    ):
+        """
+        Add an assistant message and update booking state in one round trip.
         
-        key = self._get_session_key(session_id)
-        self.client.rpush(key, json.dumps(message))
-        self.client.expire(key, self.ttl)
+        Args:
+            keys: Session keys
+            content: Assistant message content
+            booking_state: Booking state to save, if any
+            clear_booking: Whether to clear the booking state
+        """
+        async with self.pipeline() as pipe:
+            pipe.rpush(keys.history, self._encode_message("assistant", content))
+            pipe.expire(keys.history, self.ttl)
+            
+            if clear_booking:
+                pipe.delete(keys.booking_state)
+            elif booking_state is not None:
+                pipe.set(keys.booking_state, orjson.dumps(booking_state), ex=self.ttl)
+            
+            await pipe.execute()
     
-    def get_history(
+    async def get_history(
         self, 
-        session_id: str, 
+        keys: SessionKeys, 
         limit: int = 100
     ) -> List[Dict]:
         """
         Retrieve conversation history.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             limit: Maximum number of messages to retrieve
             
         Returns:
             List of messages
         """
-        key = self._get_session_key(session_id)
-        raw_messages = self.client.lrange(key, 0, -1)
+        # Slice on the server so only the requested tail is sent and parsed
+        start = -limit if limit else 0
+        raw_messages = await self.client.lrange(keys.history, start, -1)
         
-        messages = [json.loads(msg) for msg in raw_messages]
-        
-        if limit:
-            return messages[-limit:]
-        return messages
+        return [self._decode_message(msg) for msg in raw_messages]
     
-    def get_conversation_context(
+    async def get_conversation_context(
         self, 
-        session_id: str, 
+        keys: SessionKeys, 
         max_turns: int = 6
     ) -> List[Dict]:
         """
         Get recent conversation context for LLM.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             max_turns: Maximum number of conversation turns
             
         Returns:
             List of messages in format suitable for LLM
         """
-        history = self.get_history(session_id, limit=max_turns * 2)
+        history = await self.get_history(keys, limit=max_turns * 2)
         context = []
         
         for msg in history:
@@ -94,64 +154,61 @@ class RedisMemoryService:
         
         return context
     
-    def clear_session(self, session_id: str):
+    async def clear_session(self, keys: SessionKeys):
         """
         Clear all data for a session.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
         """
-        self.client.delete(self._get_session_key(session_id))
-        self.client.delete(self._get_booking_state_key(session_id))
+        await self.client.delete(keys.history, keys.booking_state)
     
-    def set_booking_state(self, session_id: str, state: Dict):
+    async def set_booking_state(self, keys: SessionKeys, state: Dict):
         """
         Save booking state for a session.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             state: Booking state dictionary
         """
-        key = self._get_booking_state_key(session_id)
-        self.client.set(key, json.dumps(state), ex=self.ttl)
+        await self.client.set(keys.booking_state, orjson.dumps(state), ex=self.ttl)
     
-    def get_booking_state(self, session_id: str) -> Dict:
+    async def get_booking_state(self, keys: SessionKeys) -> Dict:
         """
         Retrieve booking state for a session.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             
         Returns:
             Booking state dictionary or empty dict
         """
-        key = self._get_booking_state_key(session_id)
-        data = self.client.get(key)
+        data = await self.client.get(keys.booking_state)
         
         if data:
-            return json.loads(data)
+            return orjson.loads(data)
         return {}
     
-    def clear_booking_state(self, session_id: str):
+    async def clear_booking_state(self, keys: SessionKeys):
         """
         Clear booking state for a session.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
         """
-        self.client.delete(self._get_booking_state_key(session_id))
+        await self.client.delete(keys.booking_state)
     
-    def session_exists(self, session_id: str) -> bool:
+    async def session_exists(self, keys: SessionKeys) -> bool:
         """
         Check if a session exists.
         
         Args:
-            session_id: Session identifier
+            keys: Session keys
             
         Returns:
             True if session exists
         """
-        return self.client.exists(self._get_session_key(session_id)) > 0
+        return await self.client.exists(keys.history) > 0
 
 # Singleton instance
 redis_memory_service = RedisMemoryService()
\ No newline at end of file
@@ -0,0 +1,48 @@
+from functools import lru_cache
+from app.config import settings
+
+@lru_cache
+def get_groq_client():
+    """
+    Return the Groq client shared by the RAG service and booking engine.
+    
+    It runs on one httpx connection pool with HTTP/2 and keep-alive, so
+    both paths reuse warm TLS connections to the Groq API.
+    """
+    import httpx
+    from groq import Groq
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+    )
+    return Groq(api_key=settings.GROQ_API_KEY, http_client=http_client)
+
+@lru_cache
+def get_vector_store():
+    """Return the Qdrant vector store service, initializing it on first use."""
+    from app.services.vector_store import vector_store_service
+    return vector_store_service
+
+@lru_cache
+def get_redis_memory():
+    """Return the Redis memory service, initializing it on first use."""
+    from app.services.redis_memory import redis_memory_service
+    return redis_memory_service
+
+@lru_cache
+def get_embedding_service():
+    """Return the embedding service, loading the model on first use."""
+    from app.services.embeddings import embedding_service
+    return embedding_service
+
+@lru_cache
+def get_rag_service():
+    """Return the RAG service, initializing it on first use."""
+    from app.services.rag import rag_service
+    return rag_service
+
+@lru_cache
+def get_booking_engine():
+    """Return the booking engine, initializing it on first use."""
+    from app.services.booking_engine import booking_engine
+    return booking_engine
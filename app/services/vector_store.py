@@ -1,48 +1,138 @@
 import uuid
+import numpy as np
 from typing import List, Dict, Optional
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
-from app.config import settings
+from qdrant_client.http.models import (
+    Distance,
+    VectorParams,
+    PayloadSchemaType,
+    FilterSelector,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    QuantizationSearchParams
+)
+from app.config import settings, EMBEDDING_DIM
+
+# Store int8 copies of the vectors in RAM; originals are kept for rescoring
+QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(
+        type=ScalarType.INT8,
+        quantile=0.99,
+        always_ram=True
+    )
+)
+
+# Fetch extra candidates with int8 scores, then rescore them with full vectors
+SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(
+        rescore=True,
+        oversampling=2.0
+    )
+)
 
 class VectorStoreService:
     """Service for managing Qdrant vector store operations."""
     
     def __init__(self):
-        self.client = QdrantClient(
+        self.client = self._create_client()
+        self.collection_name = settings.QDRANT_COLLECTION
+        self._ensure_collection()
+        self._ensure_payload_indexes()
+    
+    def _create_client(self) -> QdrantClient:
+        """
+        Create the Qdrant client, using gRPC when enabled and reachable.
+        
+        gRPC sends vectors as packed protobuf floats rather than JSON arrays.
+        If the gRPC port can't be reached, the client falls back to HTTP.
+        
+        Returns:
+            Qdrant client
+        """
+        if settings.QDRANT_PREFER_GRPC:
+            client = QdrantClient(
+                url=settings.QDRANT_URL,
+                api_key=settings.QDRANT_API_KEY,
+                prefer_grpc=True,
+                grpc_port=settings.QDRANT_GRPC_PORT
+            )
+            try:
+                # Connections are lazy, so make one call to check gRPC works
+                client.get_collections()
+                return client
+            except Exception as e:
+                print(f"Qdrant gRPC unavailable, falling back to HTTP: {str(e)}")
+                client.close()
+        
+        return QdrantClient(
             url=settings.QDRANT_URL,
             api_key=settings.QDRANT_API_KEY
         )
-        self.collection_name = settings.QDRANT_COLLECTION
-        self._ensure_collection()
     
     def _ensure_collection(self):
-        """Ensure the collection exists, create if it doesn't."""
+        """Ensure the collection exists and is quantized, create if it doesn't."""
         try:
-            self.client.get_collection(self.collection_name)
+            collection = self.client.get_collection(self.collection_name)
         except Exception:
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(
-                    size=settings.EMBEDDING_DIM,
-                    distance=Distance.COSINE
+                    size=EMBEDDING_DIM,
+                    # Embeddings are normalized, so dot product ranks like cosine
+                    distance=Distance.DOT
+                ),
+                quantization_config=QUANTIZATION_CONFIG
+            )
+            return
+        
+        # Collections created before quantization was enabled get it applied in place
+        if collection.config.quantization_config is None:
+            try:
+                self.client.update_collection(
+                    collection_name=self.collection_name,
+                    quantization_config=QUANTIZATION_CONFIG
                 )
+            except Exception as e:
+                print(f"Could not enable quantization on {self.collection_name}: {str(e)}")
+    
+    def _ensure_payload_indexes(self):
+        """Index payload fields used in filters so they don't scan every point."""
+        try:
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="doc_id",
+                field_schema=PayloadSchemaType.KEYWORD
             )
+        except Exception as e:
+            print(f"Could not create doc_id payload index: {str(e)}")
     
     def store_chunks(
         self, 
         doc_id: str, 
         filename: str, 
         chunks: List[str], 
-        vectors: List[List[float]]
+        vectors: np.ndarray,
+        start_idx: int = 0,
+        wait: bool = True
     ) -> List[str]:
         """
         Store document chunks with their embeddings in Qdrant.
         
+        Vectors are passed to the client as a float32 array, so they are
+        never expanded into per-element Python floats here.
+        
         Args:
             doc_id: Unique document identifier
             filename: Original filename
             chunks: List of text chunks
-            vectors: List of embedding vectors
+            vectors: float32 array of embeddings, one row per chunk
+            start_idx: Index of the first chunk within the document
+            wait: Whether to wait until Qdrant has applied the upload
             
         Returns:
             List of chunk IDs
@@ -50,28 +140,24 @@ class VectorStoreService:
         if len(chunks) != len(vectors):
             raise ValueError("Number of chunks must match number of vectors")
         
-        points = []
-        chunk_ids = []
-        
-        for idx, (chunk_text, vector) in enumerate(zip(chunks, vectors)):
-            chunk_id = str(uuid.uuid4())
-            chunk_ids.append(chunk_id)
-            
-            point = PointStruct(
-                id=chunk_id,
-                vector=vector,
-                payload={
-                    "text": chunk_text,
-                    "doc_id": doc_id,
-                    "chunk_idx": idx,
-                    "filename": filename
-                }
-            )
-            points.append(point)
+        chunk_ids = [str(uuid.uuid4()) for _ in chunks]
+        payloads = [
+            {
+                "text": chunk_text,
+                "doc_id": doc_id,
+                "chunk_idx": start_idx + idx,
+                "filename": filename
+            }
+            for idx, chunk_text in enumerate(chunks)
+        ]
         
-        self.client.upsert(
+        self.client.upload_collection(
             collection_name=self.collection_name,
-            points=points
+            vectors=vectors,
+            payload=payloads,
+            ids=chunk_ids,
+            batch_size=max(len(chunk_ids), 1),
+            wait=wait
         )
         
         return chunk_ids
@@ -95,6 +181,7 @@ class VectorStoreService:
             collection_name=self.collection_name,
             query=query_vector,
             limit=top_k,
+            search_params=SEARCH_PARAMS,
             with_payload=True
         )
         
@@ -121,16 +208,16 @@ class VectorStoreService:
         """
         self.client.delete(
             collection_name=self.collection_name,
-            points_selector={
-                "filter": {
-                    "must": [
-                        {
-                            "key": "doc_id",
-                            "match": {"value": doc_id}
-                        }
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[
+                        FieldCondition(
+                            key="doc_id",
+                            match=MatchValue(value=doc_id)
+                        )
                     ]
-                }
-            }
+                )
+            )
         )
     
     def get_collection_info(self) -> Dict:
@@ -1,7 +1,4 @@
-import os
-import uuid
 from pathlib import Path
-from typing import BinaryIO
 from fastapi import UploadFile, HTTPException
 from app.config import settings
 
@@ -28,20 +25,24 @@ def validate_file_size(file: UploadFile) -> bool:
     Returns:
         True if valid size
     """
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
+    # The multipart parser already counted the bytes; only seek when it didn't.
+    # Client-sent headers such as content-length are not trusted here.
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, 2)
+        file_size = file.file.tell()
+        file.file.seek(0)
     return file_size <= settings.MAX_FILE_SIZE
 
-def save_upload_file(file: UploadFile) -> tuple[str, str]:
+def validate_upload_file(file: UploadFile):
     """
-    Save uploaded file to disk.
+    Validate an uploaded file's extension and size.
     
     Args:
         file: Uploaded file
         
-    Returns:
-        Tuple of (file_path, unique_filename)
+    Raises:
+        HTTPException: If the file type or size is not allowed
     """
     if not validate_file_extension(file.filename):
         raise HTTPException(
@@ -53,34 +54,4 @@ def save_upload_file(file: UploadFile) -> tuple[str, str]:
         raise HTTPException(
             status_code=400,
             detail=f"File too large. Max size: {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
-    
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    
-    file_ext = Path(file.filename).suffix
-    unique_filename = f"{uuid.uuid4().hex}{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            content = file.file.read()
-            buffer.write(content)
-        file.file.seek(0)
-        return file_path, unique_filename
-    except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-
-def cleanup_file(file_path: str):
-    """
-    Remove file from disk.
-    
-    Args:
-        file_path: Path to file
-    """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except Exception:
-        pass
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,9 +1,145 @@
-import PyPDF2
-from typing import BinaryIO
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, List, Optional, Tuple
 
-def extract_text_from_pdf(file_content: BinaryIO) -> str:
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+    import PyPDF2
+
+# Minimum pages per worker process; PDFs too short to give at least two
+# workers this many pages are extracted in the calling thread
+PDF_PARALLEL_MIN_PAGES = 8
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
     """
-    Extract text from a PDF file.
+    Return the shared page extraction pool, creating it on first use.
+    
+    PDFium is not thread-safe, so pages are extracted in separate processes.
+    Workers are spawned rather than forked to avoid inheriting model threads.
+    
+    Returns:
+        Process pool executor
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+def shutdown_pdf_pool(wait: bool = True):
+    """
+    Shut down the page extraction pool, if it was started.
+    
+    The next parallel extraction creates a fresh pool.
+    
+    Args:
+        wait: Whether to wait for running extractions to finish
+    """
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=wait, cancel_futures=True)
+        _pdf_pool = None
+
+def _extract_page_text(pdf, index: int) -> str:
+    """
+    Extract the text of a single page with pdfium.
+    
+    Args:
+        pdf: Open pypdfium2 document
+        index: Zero-based page index
+        
+    Returns:
+        Page text with normalized line endings
+    """
+    page = pdf[index]
+    try:
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+    finally:
+        page.close()
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of a contiguous page range in a worker process.
+    
+    Args:
+        data: Raw PDF bytes
+        start: First page index
+        stop: Page index after the last page
+        
+    Returns:
+        List of page texts
+    """
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        return [_extract_page_text(pdf, i) for i in range(start, stop)]
+    finally:
+        pdf.close()
+
+def _extract_pages_parallel(
+    file_content: BinaryIO,
+    page_count: int,
+    workers: int
+) -> List[str]:
+    """
+    Extract page texts across the process pool.
+    
+    Args:
+        file_content: Binary file content
+        page_count: Number of pages in the document
+        workers: Number of contiguous page ranges to split the work into
+        
+    Returns:
+        List of page texts in page order
+    """
+    file_content.seek(0)
+    data = file_content.read()
+    
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    
+    try:
+        return _run_page_ranges(data, ranges)
+    except BrokenProcessPool:
+        # A crashed worker (segfault, OOM kill) breaks the whole pool;
+        # replace it and retry once, so one bad upload can't disable it
+        shutdown_pdf_pool(wait=False)
+    
+    try:
+        return _run_page_ranges(data, ranges)
+    except BrokenProcessPool:
+        shutdown_pdf_pool(wait=False)
+        raise
+
+def _run_page_ranges(data: bytes, ranges: List[Tuple[int, int]]) -> List[str]:
+    """
+    Extract page ranges on the process pool.
+    
+    Args:
+        data: Raw PDF bytes
+        ranges: List of (start, stop) page ranges
+        
+    Returns:
+        List of page texts in page order
+    """
+    pool = _get_pdf_pool()
+    futures = [pool.submit(_extract_page_range, data, start, stop) for start, stop in ranges]
+    return [text for future in futures for text in future.result()]
+
+def _extract_text_pdfium(file_content: BinaryIO) -> str:
+    """
+    Extract text from a PDF with pdfium.
     
     Args:
         file_content: Binary file content
@@ -11,17 +147,58 @@ def extract_text_from_pdf(file_content: BinaryIO) -> str:
     Returns:
         Extracted text as string
     """
+    pdf = pypdfium2.PdfDocument(file_content)
     try:
-        reader = PyPDF2.PdfReader(file_content)
-        text_parts = []
+        page_count = len(pdf)
+        workers = min(os.cpu_count() or 1, page_count // PDF_PARALLEL_MIN_PAGES)
+        if workers >= 2:
+            text_parts = None
+        else:
+            text_parts = [_extract_page_text(pdf, i) for i in range(page_count)]
+    finally:
+        pdf.close()
+    
+    if text_parts is None:
+        text_parts = _extract_pages_parallel(file_content, page_count, workers)
+    return "\n".join(t for t in text_parts if t).strip()
+
+def _extract_text_pypdf2(file_content: BinaryIO) -> str:
+    """
+    Extract text from a PDF with PyPDF2.
+    
+    Args:
+        file_content: Binary file content
         
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
+    Returns:
+        Extracted text as string
+    """
+    reader = PyPDF2.PdfReader(file_content)
+    text_parts = []
+    
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text_parts.append(page_text)
+    
+    full_text = "\n".join(text_parts)
+    return full_text.strip()
+
+def extract_text_from_pdf(file_content: BinaryIO) -> str:
+    """
+    Extract text from a PDF file.
+    
+    Uses pdfium when pypdfium2 is installed and falls back to PyPDF2.
+    
+    Args:
+        file_content: Binary file content
         
-        full_text = "\n".join(text_parts)
-        return full_text.strip()
+    Returns:
+        Extracted text as string
+    """
+    try:
+        if pypdfium2 is not None:
+            return _extract_text_pdfium(file_content)
+        return _extract_text_pypdf2(file_content)
     except Exception as e:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 